@@ -0,0 +1,17 @@
+# Generated by Django 4.2.20 on 2026-10-15 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0010_alter_paymentlog_method_alter_paymentorder_method'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['user', '-ended_at'], name='payments_sub_user_ended_idx'),
+        ),
+    ]
@@ -36,6 +36,11 @@ class Subscription(models.Model):
     next_payment_date = models.DateField(blank=True, null=True)
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-ended_at'], name='payments_sub_user_ended_idx'),
+        ]  # 查詢使用者最新訂閱到期日
+
     def save(self, *args, **kwargs):
         today = timezone.now().date()
         if not self.ended_at:
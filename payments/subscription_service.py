@@ -3,6 +3,7 @@ from datetime import timedelta
 from django.utils import timezone
 
 from payments.models import Subscription
+from promotions.utils import invalidate_merchant_dashboard
 from users.models import User
 
 
@@ -29,4 +30,5 @@ def create_subscription_after_payment(user, product):
         user.role = User.Role.VIP_MERCHANT
         user.is_vip = True
         user.save()
+    invalidate_merchant_dashboard(user.restaurant_id)
     return subscription
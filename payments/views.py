@@ -3,7 +3,6 @@ import logging
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.http import HttpResponse, HttpResponseRedirect
-from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
@@ -14,8 +13,7 @@ from rest_framework.views import APIView
 from payments.models import PaymentLog, PaymentMethod, PaymentOrder, Product
 from payments.serializers import PaymentOrderSerializer, ProductSerializer
 from payments.validators import validate_payment_request
-from users.models import User
-from users.utils import check_merchant_role, token_required_cbv
+from users.utils import check_merchant_role, get_request_user, token_required_cbv
 
 from .ecpay_service import ECPayService, verify_check_mac_value
 from .linepay_service import LinePayService
@@ -44,10 +42,7 @@ class SubscriptionCreateView(APIView):
         except ValidationError as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            user = User.objects.get(uuid=request.user_uuid)
-        except User.DoesNotExist:
-            return Response({'error': '找不到使用者'}, status=status.HTTP_404_NOT_FOUND)
+        user = get_request_user(request)
 
         try:
             payment_order = prepare_payment_order(
@@ -132,7 +127,7 @@ class ECPaySubscriptionCreateView(APIView):
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        user = get_object_or_404(User, uuid=request.user_uuid)
+        user = get_request_user(request)
 
         try:
             payment_order = prepare_payment_order(
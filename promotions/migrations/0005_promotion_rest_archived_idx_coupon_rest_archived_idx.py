@@ -0,0 +1,21 @@
+# Generated by Django 4.2.20 on 2026-10-15 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('promotions', '0004_rename_img_url_promotion_image_url'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='promotion',
+            index=models.Index(fields=['restaurant', 'is_archived'], name='promotion_rest_archived_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coupon',
+            index=models.Index(fields=['restaurant', 'is_archived'], name='coupon_rest_archived_idx'),
+        ),
+    ]
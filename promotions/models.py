@@ -19,6 +19,11 @@ class Promotion(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)  # 建立時間
     uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)  # uuid
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['restaurant', 'is_archived'], name='promotion_rest_archived_idx'),
+        ]  # 查詢餐廳未封存的動態
+
 
 # 酷碰卷
 class Coupon(models.Model):
@@ -39,5 +44,10 @@ class Coupon(models.Model):
     started_at = models.DateTimeField(blank=True, null=True)  # 開始時間，可空
     uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)  # uuid
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['restaurant', 'is_archived'], name='coupon_rest_archived_idx'),
+        ]  # 查詢餐廳未封存的優惠券
+
     def __str__(self):
         return f'{self.title} - {self.restaurant.name}'
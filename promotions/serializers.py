@@ -74,14 +74,9 @@ class PromotionsCreateSerializer(serializers.ModelSerializer):
 
 
 class MerchantCouponSerializer(CouponSerializer):
-    redeemed_count = serializers.SerializerMethodField()
-    used_count = serializers.SerializerMethodField()
-
-    def get_redeemed_count(self, obj):
-        return obj.claimed_by.count()
-
-    def get_used_count(self, obj):
-        return obj.claimed_by.filter(is_used=True).count()
+    # 由查詢端 annotate 領取數與使用數
+    redeemed_count = serializers.IntegerField(read_only=True)
+    used_count = serializers.IntegerField(read_only=True)
 
 
 class UserCouponUsageSerializer(serializers.ModelSerializer):
@@ -1,3 +1,80 @@
-from django.test import TestCase
+import uuid
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from restaurants.models import Restaurant
+from users.models import User
+
+from .models import Coupon
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+)
+class MerchantDashboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.restaurant = Restaurant.objects.create(
+            name='testrestaurant',
+            address='testaddress',
+            latitude=25.0,
+            longitude=121.5,
+            place_id='test_place_id',
+        )
+        self.merchant = self.create_merchant('merchant@example.com', User.Role.MERCHANT)
+
+    def create_merchant(self, email, role):
+        return User.objects.create(
+            email=email,
+            password='strong_password123',
+            user_name='testmerchant',
+            role=role,
+            restaurant=self.restaurant,
+        )
+
+    def login(self, user):
+        token = uuid.uuid4().hex
+        cache.set(f'user_token:{user.uuid}', token)
+        self.client.cookies['auth_token'] = f'{user.uuid}:{token}'
+
+    def get_dashboard(self):
+        response = self.client.get('/api/v1/merchants/me/')
+        self.assertEqual(response.status_code, 200)
+        return response.data['result']
+
+    def test_create_and_archive_coupon_refresh_dashboard(self):
+        self.login(self.merchant)
+        self.assertEqual(self.get_dashboard()['coupons'], [])
+
+        data = {
+            'serialNumber': 'TEST-0001',
+            'title': 'testcoupon',
+            'discountType': '金額',
+            'discountValue': 100,
+        }
+        response = self.client.post('/api/v1/coupons/', data, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        result = self.get_dashboard()
+        self.assertEqual([coupon['title'] for coupon in result['coupons']], ['testcoupon'])
+        self.assertTrue(result['merchant_status']['is_coupon_limit_reached'])
+
+        coupon = Coupon.objects.get(serial_number='TEST-0001')
+        response = self.client.patch(f'/api/v1/coupons/{coupon.uuid}/')
+        self.assertEqual(response.status_code, 200)
+
+        result = self.get_dashboard()
+        self.assertEqual(result['coupons'], [])
+        self.assertFalse(result['merchant_status']['is_coupon_limit_reached'])
+
+    def test_merchants_sharing_restaurant_get_their_own_status(self):
+        vip_merchant = self.create_merchant('vip@example.com', User.Role.VIP_MERCHANT)
+
+        self.login(self.merchant)
+        self.assertEqual(self.get_dashboard()['merchant_status']['role'], 'merchant')
+
+        self.login(vip_merchant)
+        self.assertEqual(self.get_dashboard()['merchant_status']['role'], 'vip_merchant')
@@ -0,0 +1,25 @@
+from django.core.cache import cache
+
+# 商家後台（MerchantView）回應快取秒數
+MERCHANT_DASHBOARD_CACHE_TIMEOUT = 60
+
+
+def _merchant_dashboard_version_key(restaurant_id):
+    return f'merchant_dashboard_version:{restaurant_id}'
+
+
+# 回應含使用者自己的角色與 VIP 到期日，key 需帶 user_id；版本號仍以餐廳為單位
+def get_merchant_dashboard_cache_key(restaurant_id, user_id):
+    version = cache.get(_merchant_dashboard_version_key(restaurant_id), 0)
+    return f'merchant_dashboard:{restaurant_id}:{version}:{user_id}'
+
+
+# 動態、優惠券、領取/使用紀錄或訂閱異動時呼叫，讓舊快取失效
+def invalidate_merchant_dashboard(restaurant_id):
+    if not restaurant_id:
+        return
+    version_key = _merchant_dashboard_version_key(restaurant_id)
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, 1, timeout=None)
@@ -1,12 +1,20 @@
 from datetime import date
 
+from django.core.cache import cache
+from django.db.models import Count, Max, Prefetch, Q, prefetch_related_objects
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from users.models import User, UserCoupon
-from users.utils import check_and_downgrade_vip, check_merchant_role, token_required_cbv
+from users.utils import (
+    MERCHANT_ROLES,
+    check_and_downgrade_vip,
+    check_merchant_role,
+    get_request_user,
+    token_required_cbv,
+)
 
 from .models import Coupon, Promotion
 from .serializers import (
@@ -16,36 +24,38 @@ from .serializers import (
     PromotionSerializer,
     UserCouponUsageSerializer,
 )
+from .utils import (
+    MERCHANT_DASHBOARD_CACHE_TIMEOUT,
+    get_merchant_dashboard_cache_key,
+    invalidate_merchant_dashboard,
+)
 
 
 class CreateCouponView(APIView):
     @token_required_cbv
     def post(self, request):
-        user = User.objects.filter(uuid=request.user_uuid).first()
+        user = User.objects.select_related('restaurant').filter(uuid=request.user_uuid).first()
         if not user:
             return Response({'success': False}, status=status.HTTP_401_UNAUTHORIZED)
 
-        if user.role not in ['merchant', 'vip_merchant']:
+        if user.role not in MERCHANT_ROLES:
             return Response({'success': False}, status=status.HTTP_403_FORBIDDEN)
 
-        if user.role == 'merchant':
-            has_coupon = Coupon.objects.filter(
-                restaurant=user.restaurant, is_archived=False
-            ).exists()
-            if has_coupon:
-                return Response({'success': False}, status=status.HTTP_403_FORBIDDEN)
-        if user.role == 'vip_merchant':
-            count = Coupon.objects.filter(restaurant=user.restaurant, is_archived=False).count()
-            if count >= 3:
-                return Response(
-                    {'success': False},
-                    status=status.HTTP_403_FORBIDDEN,
-                )
-        data = request.data.copy()
-        serializer = CouponSerializer(data=data)
+        # 一般商家 1 張、VIP 商家 3 張；只需確認第 limit 筆是否存在，不必 COUNT 全部
+        limit = 3 if user.role == 'vip_merchant' else 1
+        reached_limit = (
+            Coupon.objects.filter(restaurant=user.restaurant, is_archived=False)
+            .values_list('pk', flat=True)[limit - 1 : limit]
+            .exists()
+        )
+        if reached_limit:
+            return Response({'success': False}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = CouponSerializer(data=request.data)
 
         if serializer.is_valid():
             serializer.save(restaurant=user.restaurant)
+            invalidate_merchant_dashboard(user.restaurant_id)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         else:
             return Response({'success': False}, status=status.HTTP_400_BAD_REQUEST)
@@ -54,31 +64,39 @@ class CreateCouponView(APIView):
 class ClaimCouponView(APIView):
     @token_required_cbv
     def post(self, request, uuid):
-        user = get_object_or_404(User, uuid=request.user_uuid)
-        coupon = get_object_or_404(Coupon, uuid=uuid, is_archived=False)
+        user = get_request_user(request)
+        coupon = get_object_or_404(
+            Coupon.objects.only('id', 'restaurant'), uuid=uuid, is_archived=False
+        )
 
-        if UserCoupon.objects.filter(user=user, coupon=coupon).exists():
+        _, created = UserCoupon.objects.get_or_create(user=user, coupon=coupon)
+        if not created:
             return Response({'success': False}, status=status.HTTP_200_OK)
 
-        UserCoupon.objects.create(user=user, coupon=coupon)
+        invalidate_merchant_dashboard(coupon.restaurant_id)
+
         return Response({'success': True}, status=status.HTTP_201_CREATED)
 
 
 class PromotionCreateView(APIView):
     @token_required_cbv
     def post(self, request):
-        user = get_object_or_404(User, uuid=request.user_uuid)
+        user = get_request_user(request)
 
-        if user.role not in ['merchant', 'vip_merchant']:
+        if user.role not in MERCHANT_ROLES:
             return Response({'error': '此帳戶無建立動態權限'}, status=status.HTTP_403_FORBIDDEN)
 
         if not user.restaurant:
             return Response({'error': '帳戶未綁定餐廳'}, status=status.HTTP_403_FORBIDDEN)
 
-        promotion_count = user.restaurant.promotions.filter(is_archived=False).count()
         limit = 3 if user.role == 'vip_merchant' or user.is_vip else 1
+        reached_limit = (
+            user.restaurant.promotions.filter(is_archived=False)
+            .values_list('pk', flat=True)[limit - 1 : limit]
+            .exists()
+        )
 
-        if promotion_count >= limit:
+        if reached_limit:
             role_display = 'VIP 商家' if user.is_vip else '一般商家'
             return Response({'error': f'{role_display} 最多只能建立 {limit} 則動態'}, status=400)
 
@@ -90,10 +108,9 @@ class PromotionCreateView(APIView):
             },
         )
         if serializer.is_valid():
-            promotion = serializer.save()
-            return Response(
-                PromotionsCreateSerializer(promotion).data, status=status.HTTP_201_CREATED
-            )
+            serializer.save()
+            invalidate_merchant_dashboard(user.restaurant_id)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response({'success': False}, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -102,57 +119,82 @@ class MerchantView(APIView):
     @check_merchant_role
     @check_and_downgrade_vip
     def get(self, request):
-        user = get_object_or_404(User, uuid=request.user_uuid)
-        if user.role not in ['merchant', 'vip_merchant']:
+        user = get_request_user(request)
+        if user.role not in MERCHANT_ROLES:
             return Response({'success': False}, status=status.HTTP_403_FORBIDDEN)
 
         restaurant = user.restaurant
         if not restaurant:
             return Response({'success': False}, status=status.HTTP_400_BAD_REQUEST)
 
-        promotions = Promotion.objects.filter(restaurant=restaurant, is_archived=False)
-        coupons = Coupon.objects.filter(restaurant=restaurant, is_archived=False)
+        cache_key = get_merchant_dashboard_cache_key(restaurant.id, user.pk)
+        result = cache.get_or_set(
+            cache_key,
+            lambda: self._build_result(user, restaurant),
+            MERCHANT_DASHBOARD_CACHE_TIMEOUT,
+        )
+        return Response({'result': result}, status=status.HTTP_200_OK)
+
+    def _build_result(self, user, restaurant):
+        # 在已載入的餐廳上預取未封存的動態與優惠券，計數與序列化共用同一份結果
+        prefetch_related_objects(
+            [restaurant],
+            Prefetch(
+                'promotions',
+                queryset=Promotion.objects.filter(is_archived=False),
+                to_attr='active_promotions',
+            ),
+            Prefetch(
+                'coupons',
+                queryset=Coupon.objects.filter(is_archived=False).annotate(
+                    redeemed_count=Count('claimed_by'),
+                    used_count=Count('claimed_by', filter=Q(claimed_by__is_used=True)),
+                ),
+                to_attr='active_coupons',
+            ),
+        )
+        promotions = restaurant.active_promotions
+        coupons = restaurant.active_coupons
         max_count = 3 if user.role == 'vip_merchant' else 1
-        is_coupon_limit_reached = coupons.count() >= max_count
-        is_promotion_limit_reached = promotions.count() >= max_count
+        is_coupon_limit_reached = len(coupons) >= max_count
+        is_promotion_limit_reached = len(promotions) >= max_count
 
-        latest_sub = user.subscriptions.order_by('-ended_at').first()
+        latest_ended_at = user.subscriptions.aggregate(latest=Max('ended_at'))['latest']
         vip_expiry = (
-            latest_sub.ended_at if latest_sub and latest_sub.ended_at >= date.today() else None
+            latest_ended_at if latest_ended_at and latest_ended_at >= date.today() else None
         )
 
-        return Response(
-            {
-                'result': {
-                    'restaurant': {
-                        'uuid': str(restaurant.uuid),
-                        'name': restaurant.name,
-                    },
-                    'merchant_status': {
-                        'role': user.role,
-                        'is_coupon_limit_reached': is_coupon_limit_reached,
-                        'is_promotion_limit_reached': is_promotion_limit_reached,
-                        'vip_expiry': vip_expiry,
-                    },
-                    'promotions': PromotionSerializer(promotions, many=True).data,
-                    'coupons': MerchantCouponSerializer(coupons, many=True).data,
-                }
+        return {
+            'restaurant': {
+                'uuid': str(restaurant.uuid),
+                'name': restaurant.name,
             },
-            status=status.HTTP_200_OK,
-        )
+            'merchant_status': {
+                'role': user.role,
+                'is_coupon_limit_reached': is_coupon_limit_reached,
+                'is_promotion_limit_reached': is_promotion_limit_reached,
+                'vip_expiry': vip_expiry,
+            },
+            'promotions': PromotionSerializer(promotions, many=True).data,
+            'coupons': MerchantCouponSerializer(coupons, many=True).data,
+        }
 
 
 class CouponUsageView(APIView):
     @token_required_cbv
     def get(self, request, uuid):
-        user = get_object_or_404(User, uuid=request.user_uuid)
-        coupon = get_object_or_404(Coupon, uuid=uuid)
-
-        if user.restaurant != coupon.restaurant:
-            return Response({'success': False}, status=status.HTTP_403_FORBIDDEN)
+        user = get_request_user(request)
+        coupon = get_object_or_404(
+            Coupon.objects.only('id', 'title'), uuid=uuid, restaurant=user.restaurant
+        )
 
-        user_coupons = UserCoupon.objects.filter(coupon=coupon).select_related('user')
-        serializer = UserCouponUsageSerializer(user_coupons, many=True)
+        user_coupons = (
+            UserCoupon.objects.filter(coupon=coupon)
+            .select_related('user')
+            .only('uuid', 'is_used', 'user__email')
+        )
+        # 分批讀取領取紀錄，避免熱門優惠券一次載入全部 model instance
+        serializer = UserCouponUsageSerializer(user_coupons.iterator(chunk_size=500), many=True)
 
         return Response(
             {'title': coupon.title, 'usages': serializer.data}, status=status.HTTP_200_OK
@@ -163,33 +205,40 @@ class CouponDetailView(APIView):
     @token_required_cbv
     @check_merchant_role
     def get(self, request, uuid):
-        user = get_object_or_404(User, uuid=request.user_uuid)
-
-        coupon = get_object_or_404(Coupon, uuid=uuid, is_archived=False)
-        if user.restaurant != coupon.restaurant:
-            return Response({'success': False}, status=status.HTTP_403_FORBIDDEN)
+        user = get_request_user(request)
+
+        coupon = get_object_or_404(
+            Coupon.objects.select_related('restaurant').annotate(
+                total_claimed=Count('claimed_by'),
+                total_used=Count('claimed_by', filter=Q(claimed_by__is_used=True)),
+            ),
+            uuid=uuid,
+            restaurant=user.restaurant,
+            is_archived=False,
+        )
         serializer = CouponSerializer(coupon)
         result = serializer.data
-        result['total_claimed'] = UserCoupon.objects.filter(coupon=coupon).count()
-        result['total_used'] = UserCoupon.objects.filter(coupon=coupon, is_used=True).count()
+        result['total_claimed'] = coupon.total_claimed
+        result['total_used'] = coupon.total_used
 
         return Response({'result': result}, status=status.HTTP_200_OK)
 
     @token_required_cbv
     def patch(self, request, uuid):
-        user = get_object_or_404(User, uuid=request.user_uuid)
+        user = get_request_user(request)
 
-        if user.role not in ['merchant', 'vip_merchant']:
+        if user.role not in MERCHANT_ROLES:
             return Response({'success': False}, status=status.HTTP_403_FORBIDDEN)
 
         restaurant = user.restaurant
         if not restaurant:
             return Response({'success': False}, status=status.HTTP_400_BAD_REQUEST)
 
-        coupon = get_object_or_404(Coupon, uuid=uuid, restaurant=restaurant)
+        updated = Coupon.objects.filter(uuid=uuid, restaurant=restaurant).update(is_archived=True)
+        if not updated:
+            return Response({'success': False}, status=status.HTTP_404_NOT_FOUND)
 
-        coupon.is_archived = True
-        coupon.save()
+        invalidate_merchant_dashboard(restaurant.id)
 
         return Response({'success': True}, status=status.HTTP_200_OK)
 
@@ -197,28 +246,31 @@ class CouponDetailView(APIView):
 class PromotionDetailView(APIView):
     @token_required_cbv
     def get(self, request, uuid):
-        user = get_object_or_404(User, uuid=request.user_uuid)
+        user = get_request_user(request)
 
-        promotion = get_object_or_404(Promotion, uuid=uuid, is_archived=False)
-        if user.restaurant != promotion.restaurant:
-            return Response({'success': False}, status=status.HTTP_403_FORBIDDEN)
+        promotion = get_object_or_404(
+            Promotion, uuid=uuid, restaurant=user.restaurant, is_archived=False
+        )
         serializer = PromotionSerializer(promotion)
         return Response({'result': serializer.data}, status=status.HTTP_200_OK)
 
     @token_required_cbv
     def patch(self, request, uuid):
-        user = get_object_or_404(User, uuid=request.user_uuid)
+        user = get_request_user(request)
 
-        if user.role not in ['merchant', 'vip_merchant']:
+        if user.role not in MERCHANT_ROLES:
             return Response({'success': False}, status=status.HTTP_403_FORBIDDEN)
 
         restaurant = user.restaurant
         if not restaurant:
             return Response({'success': False}, status=status.HTTP_400_BAD_REQUEST)
 
-        promotion = get_object_or_404(Promotion, uuid=uuid, restaurant=restaurant)
+        updated = (
+            Promotion.objects.filter(uuid=uuid, restaurant=restaurant).update(is_archived=True)
+        )
+        if not updated:
+            return Response({'success': False}, status=status.HTTP_404_NOT_FOUND)
 
-        promotion.is_archived = True
-        promotion.save()
+        invalidate_merchant_dashboard(restaurant.id)
 
         return Response({'success': True}, status=status.HTTP_200_OK)
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.20 on 2026-10-15 10:00
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+# 清除重複領取的紀錄，每組 (user, coupon) 優先保留已使用者，其次保留 id 最小者
+def remove_duplicate_user_coupons(apps, schema_editor):
+    UserCoupon = apps.get_model('users', 'UserCoupon')
+    duplicates = (
+        UserCoupon.objects.values('user_id', 'coupon_id')
+        .annotate(row_count=Count('id'))
+        .filter(row_count__gt=1)
+    )
+    for pair in duplicates:
+        ids = list(
+            UserCoupon.objects.filter(user_id=pair['user_id'], coupon_id=pair['coupon_id'])
+            .order_by('-is_used', 'id')
+            .values_list('id', flat=True)
+        )
+        UserCoupon.objects.filter(id__in=ids[1:]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_user_google_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_user_coupons, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='usercoupon',
+            constraint=models.UniqueConstraint(fields=('user', 'coupon'), name='unique_user_coupon'),
+        ),
+    ]
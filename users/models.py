@@ -53,6 +53,11 @@ class UserCoupon(models.Model):
     claimed_at = models.DateTimeField(auto_now_add=True)  # 領取時間，預設為現在
     uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)  # uuid
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'coupon'], name='unique_user_coupon'),
+        ]  # 同一使用者同一優惠券只能領取一次
+
 
 # 使用者收藏
 class Favorite(models.Model):
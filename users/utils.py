@@ -1,13 +1,18 @@
 from functools import wraps
 
 from django.core.cache import cache
+from django.db.models import Max
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.response import Response
 
+from promotions.utils import invalidate_merchant_dashboard
 from users.models import User
 
+# 具商家權限的角色
+MERCHANT_ROLES = frozenset({'merchant', 'vip_merchant'})
+
 
 # CBV驗證裝飾器
 def token_required_cbv(view_func):
@@ -69,12 +74,21 @@ def optional_token_cbv(view_func):
     return wrapper
 
 
+# 取得登入使用者（含綁定餐廳），同一請求內只查詢一次
+def get_request_user(request):
+    user = getattr(request, 'user_obj', None)
+    if user is None:
+        user = get_object_or_404(User.objects.select_related('restaurant'), uuid=request.user_uuid)
+        request.user_obj = user
+    return user
+
+
 def check_merchant_role(view_func):
     @wraps(view_func)
     def wrapper(self, request, *args, **kwargs):
-        user = get_object_or_404(User, uuid=request.user_uuid)
+        user = get_request_user(request)
 
-        if user.role not in ['merchant', 'vip_merchant']:
+        if user.role not in MERCHANT_ROLES:
             return Response({'error': '您不是商家用戶'}, status=403)
 
         request.user = user
@@ -88,11 +102,15 @@ def check_and_downgrade_vip(view_func):
     def wrapped_view(self, request, *args, **kwargs):
         user = getattr(request, 'user', None)
         if user and user.role == 'vip_merchant':
-            latest_sub = user.subscriptions.order_by('-ended_at').first()
-            if latest_sub and latest_sub.ended_at < timezone.now().date():
+            latest_ended_at = user.subscriptions.aggregate(latest=Max('ended_at'))['latest']
+            if latest_ended_at and latest_ended_at < timezone.now().date():
+                # 條件式 UPDATE 只寫兩個欄位，重複執行也只會降級一次
+                User.objects.filter(pk=user.pk, role='vip_merchant').update(
+                    role='merchant', is_vip=False
+                )
                 user.role = 'merchant'
                 user.is_vip = False
-                user.save()
+                invalidate_merchant_dashboard(user.restaurant_id)
         return view_func(self, request, *args, **kwargs)
 
     return wrapped_view
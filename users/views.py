@@ -12,6 +12,7 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from promotions.utils import invalidate_merchant_dashboard
 from restaurants.serializers import FullRestaurantSerializer
 from utilities.email_util import send_email
 
@@ -159,11 +160,12 @@ class UserCouponView(APIView):
 
     @token_required_cbv
     def delete(self, request, uuid):
-        deleted_count, _ = UserCoupon.objects.filter(
-            uuid=uuid, user__uuid=request.user_uuid
-        ).delete()
+        user_coupons = UserCoupon.objects.filter(uuid=uuid, user__uuid=request.user_uuid)
+        restaurant_id = user_coupons.values_list('coupon__restaurant_id', flat=True).first()
+        deleted_count, _ = user_coupons.delete()
 
         if deleted_count:
+            invalidate_merchant_dashboard(restaurant_id)
             return Response(status=status.HTTP_204_NO_CONTENT)
         return Response({'success': False}, status=status.HTTP_404_NOT_FOUND)
 
@@ -187,6 +189,7 @@ class UserCouponView(APIView):
             user_coupon.is_used = is_used
             user_coupon.used_at = timezone.now() if is_used else None
             user_coupon.save()
+            invalidate_merchant_dashboard(user_coupon.coupon.restaurant_id)
 
             return Response(
                 {